@@ -1,23 +1,34 @@
 #!/usr/bin/python3 -u
-"""lp2gh.py <lp_bug_id> [options]
+"""lp2gh.py <lp_bug_id> [<lp_bug_id> ...] [options]
 
-This script moves a bug from Launchpad to GitHub. 
+This script moves one or more bugs from Launchpad to GitHub. 
 
-The script does the following:
-1. Create a new issue in the GitHub repository with the same title, description, and comments.
-2. Add a comment in the new GitHub issue with the link to the Launchpad bug.
-3. Add appropriate labels to the GitHub issue.
-4. Add a comment in the Launchpad bug with the link to the GitHub issue.
-5. Add a label to the Launchpad bug with the GitHub issue number.
-6. Close the Launchpad bug.
+The script does the following for each bug:
+1. Create a new issue in the GitHub repository with the same title, description, labels and assignee,
+   with the link to the Launchpad bug appended to the description.
+2. Add a label to the Launchpad bug marking it as relocated.
+3. Add a comment in the Launchpad bug with the link to the GitHub issue.
+4. Close the Launchpad bug.
 
 Options:
---github_token <token>          GitHub personal access token. If not provided, the script will use the token from the 'gh' CLI.
+--github_token <token>          GitHub personal access token. If not provided, the script will use the token from the 'gh' config (~/.config/gh/hosts.yml),
+                                then $GH_TOKEN / $GITHUB_TOKEN, and finally the 'gh' CLI. A token obtained from the 'gh' CLI
+                                is cached in the keyring for an hour.
 --github_repo <repo>            GitHub repository to move the bug to. Default is 'sinanawad/issues_test'.
---github_assignee <assignee>    GitHub user to assign the issue to. If not provided, the script will use the token from the 'gh' CLI.
+--github_assignee <assignee>    GitHub user to assign the issue to. If not provided, the account the GitHub token belongs to is used.
 --do_not_assign                 Do not assign the issue to the assignee provided or taken from 'gh' CLI.
+--use_import_api                Create the issue through GitHub's issue import API, which is not subject to the secondary rate limit
+                                on issue creation. Meant for moving many bugs, the issue shows up only once the import is processed.
+                                Always used when more than one bug is moved.
 --commit_changes                Commit changes to the GitHub and Launchpad. Default is False.
---i_am_sure                     Confirm that you want to proceed with moving the bug to GitHub. (will not prompt for confirmation)
+--i_am_sure                     Confirm that you want to proceed with moving the bugs to GitHub. (will not prompt for confirmation)
+
+When several bugs are given, the next bugs are loaded from Launchpad while the current one is being moved.
+Bugs that were already relocated are skipped. Bugs that fail to move don't stop the run: they are listed at the end
+and the script exits with status 1, retrying them is safe.
+Bugs whose GitHub issue import didn't complete in time, or whose GitHub issue was created but the Launchpad update failed,
+are listed separately and the script exits with status 2: their GitHub issue exists (or may still appear), so finish
+them by hand rather than retrying them.
 
 Prerequisites:
 1. To run the script, install the launchpadlib library and make sure the keyring library is installed
@@ -27,10 +38,12 @@ Prerequisites:
 2. Be sure to run it as your username in Launchpad. And that you have the correct keyring configured (e.g. by PYTHON_KEYRING_BACKEND=keyring.backends.SecretService.Keyring)
    Launchpad will prompt you for confirmation the first time you run the script, if you don't already have an OAuth token stored in your keyring.
 
-3. You need the github python library installed.
-            sudo apt install python3-github (documentation at https://pygithub.readthedocs.io/en/latest/introduction.html)
+3. You need the requests python library installed, GitHub is accessed directly through its REST API.
+            sudo apt install python3-requests (documentation at https://requests.readthedocs.io/)
 
-4. Either you need to have the 'gh' CLI installed and authenticated with GitHub, or provide your token via command line
+4. Either you need to have the 'gh' CLI authenticated with GitHub, a token in $GH_TOKEN / $GITHUB_TOKEN, or provide your token via command line
+   Optionally, install the yaml library to read the token from the 'gh' config without running the CLI.
+            sudo apt install python3-yaml (documentation at https://pyyaml.org/wiki/PyYAMLDocumentation)
 
 5. Make sure you have write permissions to the GitHub repository you are moving the bug to, and to Launchpad to close the bug and add comments.
 """
@@ -58,17 +71,19 @@ Prerequisites:
 
 
 import argparse
+import dataclasses
 import datetime
+import functools
+import json
 import sys
 import time
 import os
-import yaml
-import subprocess
-
+import queue
+import random
+import threading
 
-from launchpadlib.launchpad import Launchpad
-from github import Github
-from github import Auth
+# launchpadlib, requests, yaml, keyring and subprocess are imported where they are used: --help and argument errors
+# don't load any of them, and a failed GitHub token lookup stops before launchpadlib and requests are loaded
 
 APP_NAME = 'lp2gh'
 LP_ENVIRON = 'qastaging'  #'production'
@@ -76,38 +91,247 @@ RELOC_TAG = 'relocated-to-github'
 GH_TRIAGE_LABEL = 'state/untriaged'
 GH_IMPORT_LABEL = 'imported-from-lp'
 GH_DEFAULT_REPO = 'sinanawad/utils' #'juju/juju'
-
-
-global_commit_changes = False
-global_github_repo_name = None
+GH_HOST = 'github.com'
+GH_CONFIG_DIR = '~/.config/gh'
+GH_TOKEN_CACHE_SERVICE = f'{APP_NAME}-gh-token'  # keyring service the token from the gh CLI is cached under
+GH_TOKEN_CACHE_TTL = 3600  # seconds
+GH_API_URL = 'https://api.github.com'
+GH_IMPORT_ACCEPT = 'application/vnd.github.golden-comet-preview+json'
+GH_IMPORT_POLL_INTERVAL = 2  # seconds
+GH_IMPORT_TIMEOUT = 120  # seconds
+GH_RATE_LIMIT_BUFFER = 100  # Start waiting for the rate limit reset when fewer requests than this are left
+GH_MAX_RETRIES = 3
+LP_PREFETCH_DEPTH = 8  # Bugs loaded from Launchpad ahead of the one being moved
+POST_MIN_INTERVAL = 1.0  # seconds between two content creating requests, as recommended by GitHub
+POST_JITTER = 0.2  # seconds
+
+
+@dataclasses.dataclass(frozen=True)
+class RunConfig:
+    # Settings for the whole run, built once in main() and passed down explicitly so the mover doesn't rely on module state
+    commit: bool
+    repo: str
+    assignee: str
+    do_not_assign: bool
+    use_import_api: bool
+    i_am_sure: bool
+
+
+class GitHubError(Exception):
+    def __init__(self, message, status_code):
+        super().__init__(message)
+        self.status_code = status_code
+
+class GitHubImportPending(Exception):
+    # The import was queued but not processed in time, GitHub may still create the issue afterwards
+    def __init__(self, message, import_url):
+        super().__init__(message)
+        self.import_url = import_url
+
+class LaunchpadNotUpdated(Exception):
+    # The GitHub issue was created but the Launchpad bug couldn't be updated
+    pass
+
+
+global_last_post_time = 0.0
+global_post_lock = threading.Lock()
+global_lp_lock = threading.Lock()  # launchpadlib is not thread safe, the loader thread and the main thread take turns
 
 def lp_login():
+    from launchpadlib.launchpad import Launchpad
+
     lp = Launchpad.login_with(APP_NAME, LP_ENVIRON, version='devel')
     self_link = lp.me.self_link
     print(f'LP: Running as: {lp.me.web_link}', file=sys.stderr)
     return lp
 
-def gh_login(gh_user_details):
-     # Load GitHub
-    gh = Github(gh_user_details[0])
-    print(f'GH: Running as {gh_user_details[1]}', file=sys.stderr)
-    return gh
+def gh_login(github_token):
+    import requests
+
+    # A single session for the whole run, so the connection to the API is reused between calls
+    gh = requests.Session()
+    gh.headers.update({
+        'Authorization': f'Bearer {github_token}',
+        'Accept': 'application/vnd.github+json',
+        'X-GitHub-Api-Version': '2022-11-28',
+    })
+    # Also validates the token, and tells which account it belongs to when that is not known yet (e.g. token from $GH_TOKEN)
+    gh_user = gh_request(gh, 'GET', '/user')
+    print(f'GH: Running as {gh_user["login"]}', file=sys.stderr)
+    return gh, gh_user['login']
+
+def throttle_post():
+    # Space content creating requests (GitHub and Launchpad alike) at least POST_MIN_INTERVAL apart,
+    # to stay clear of the secondary rate limits
+    global global_last_post_time
+    with global_post_lock:
+        elapsed = time.monotonic() - global_last_post_time
+        if elapsed < POST_MIN_INTERVAL:
+            time.sleep(POST_MIN_INTERVAL - elapsed + random.uniform(0, POST_JITTER))
+        global_last_post_time = time.monotonic()
+
+def gh_retry_delay(response, attempt):
+    # Seconds to wait before retrying a rate limited request, None if the request failed for another reason
+    if response.status_code not in (403, 429):
+        return None
+    backoff = POST_MIN_INTERVAL * 2 ** attempt
+    retry_after = response.headers.get('Retry-After')
+    if retry_after is not None:
+        # Normally seconds, but an HTTP-date is allowed too: back off instead of parsing it
+        return int(retry_after) if retry_after.isdigit() else backoff
+    if response.headers.get('X-RateLimit-Remaining') == '0':
+        reset = response.headers.get('X-RateLimit-Reset')
+        return max(POST_MIN_INTERVAL, int(reset) - time.time()) if reset is not None and reset.isdigit() else backoff
+    if 'rate limit' in response.text.lower():
+        return backoff
+    return None
+
+def gh_request(gh, method, path, **kwargs):
+    # path is relative to the API root, full API URLs (e.g. returned in a previous response) are accepted as well
+    url = path if path.startswith('https://') else GH_API_URL + path
+    for attempt in range(GH_MAX_RETRIES + 1):
+        if method != 'GET':
+            throttle_post()
+        response = gh.request(method, url, **kwargs)
+        retry_delay = gh_retry_delay(response, attempt)
+        if retry_delay is None or attempt == GH_MAX_RETRIES:
+            break
+        print(f'GH: Rate limited on {method} {path}, retrying in {retry_delay:.0f}s', file=sys.stderr)
+        time.sleep(retry_delay)
+    if not response.ok:
+        raise GitHubError(f'GitHub API call {method} {path} failed with {response.status_code}: {response.text}', response.status_code)
+    gh_wait_for_rate_limit(response)
+    return response.json() if response.content else None
+
+def gh_wait_for_rate_limit(response):
+    # Sleep until the reset when getting close to the primary rate limit, rather than running into a 403
+    remaining = response.headers.get('X-RateLimit-Remaining')
+    reset = response.headers.get('X-RateLimit-Reset')
+    if remaining is None or reset is None or int(remaining) >= GH_RATE_LIMIT_BUFFER:
+        return
+    wait = max(0, int(reset) - time.time())
+    print(f'GH: Only {remaining} API requests left, waiting {wait:.0f}s for the rate limit to reset', file=sys.stderr)
+    time.sleep(wait)
+
+# The repository and the assignee don't change during a run, only look them up once
+@functools.lru_cache(maxsize=4)
+def gh_get_repo(gh, repo_name):
+    return gh_request(gh, 'GET', f'/repos/{repo_name}')
+
+@functools.lru_cache(maxsize=4)
+def gh_get_user(gh, login):
+    return gh_request(gh, 'GET', f'/users/{login}')
+
+def gh_read_hosts_file():
+    # gh keeps its settings in a plain YAML file, read it directly rather than spawning the CLI.
+    # Returns the GH_HOST entry: the active 'user', and its 'oauth_token' unless gh keeps the token in the system keyring
+    # (newer gh versions). {} if the file can't be read.
+    try:
+        import yaml
+    except ImportError:
+        # Optional, the environment and the gh CLI are tried next
+        return {}
+
+    hosts_path = os.path.join(os.environ.get('GH_CONFIG_DIR', os.path.expanduser(GH_CONFIG_DIR)), 'hosts.yml')
+    try:
+        with open(hosts_path) as f:
+            hosts = yaml.safe_load(f) or {}
+    except (OSError, yaml.YAMLError):
+        return {}
+    return hosts.get(GH_HOST) or {}
+
+def gh_token_keyring():
+    # The token from the gh CLI is cached in the keyring launchpadlib uses as well, None if it isn't installed
+    try:
+        import keyring
+        import keyring.errors
+    except ImportError:
+        return None
+    return keyring
+
+def gh_read_cached_token(active_account):
+    # (token, account) from a recent 'gh auth status' run. None if there is none, it expired, or it belongs to another
+    # account than the one active in gh (e.g. after 'gh auth switch'), or the active account is unknown (no readable hosts.yml).
+    if active_account is None:
+        return None
+    keyring = gh_token_keyring()
+    if keyring is None:
+        return None
+    try:
+        cached = keyring.get_password(GH_TOKEN_CACHE_SERVICE, GH_HOST)
+        if cached is None:
+            return None
+        cached = json.loads(cached)
+        if time.time() >= cached['expires']:
+            gh_forget_cached_token()
+            return None
+        if cached['host'] != GH_HOST or cached['account'] != active_account:
+            return None
+        return cached['token'], cached['account']
+    except (keyring.errors.KeyringError, ValueError, KeyError, TypeError):
+        return None
+
+def gh_write_cached_token(github_token, github_account):
+    # Failing to cache the token is not an error
+    keyring = gh_token_keyring()
+    if keyring is None:
+        return
+    cached = {'host': GH_HOST, 'account': github_account, 'token': github_token, 'expires': time.time() + GH_TOKEN_CACHE_TTL}
+    try:
+        keyring.set_password(GH_TOKEN_CACHE_SERVICE, GH_HOST, json.dumps(cached))
+    except keyring.errors.KeyringError as e:
+        print(f'GH: Could not cache the token: {e}', file=sys.stderr)
+
+def gh_forget_cached_token():
+    keyring = gh_token_keyring()
+    if keyring is None:
+        return
+    try:
+        keyring.delete_password(GH_TOKEN_CACHE_SERVICE, GH_HOST)
+    except keyring.errors.KeyringError:
+        pass
 
 def gh_get_user_token_from_cli():
-    # Use gh CLI to get the GitHub token
+    # Returns (token, account, source), source being one of 'gh config', 'environment', 'cache' or 'gh CLI'
+    # 1. gh hosts file
+    gh_host = gh_read_hosts_file()
+    if gh_host.get('oauth_token') and gh_host.get('user'):
+        print(f'GH: Token successfully loaded for account {gh_host["user"]} from gh config', file=sys.stderr)
+        return gh_host['oauth_token'], gh_host['user'], 'gh config'
+
+    # 2. Environment, the account is unknown in this case
+    for env_var in ('GH_TOKEN', 'GITHUB_TOKEN'):
+        github_token = os.environ.get(env_var)
+        if github_token:
+            print(f'GH: Token successfully loaded from ${env_var}', file=sys.stderr)
+            return github_token, None, 'environment'
+
+    # 3. Last resort, ask the gh CLI, unless it was asked recently
+    gh_user_details = gh_read_cached_token(gh_host.get('user'))
+    if gh_user_details is not None:
+        print(f'GH: Token successfully loaded for account {gh_user_details[1]} from cache', file=sys.stderr)
+        return gh_user_details + ('cache',)
+
+    import subprocess
+
     result = subprocess.run(['gh', 'auth', 'status', '--show-token'], capture_output=True, text=True)
     if result.returncode != 0:
         raise Exception("Failed to get GitHub token using gh CLI")
     
     # Extract the token from the output
-    token_line = next(line for line in result.stdout.splitlines() if 'Token:' in line)
-    github_token = token_line.split('Token: ')[1].strip()
-    token_line = next(line for line in result.stdout.splitlines() if 'account ' in line)
-    github_account = token_line.split('account ')[1].strip()
-    github_account = github_account.split(' ')[0].strip()
+    github_token = None
+    github_account = None
+    for line in result.stdout.splitlines():
+        if github_token is None and 'Token:' in line:
+            github_token = line.split('Token: ')[1].strip()
+        elif github_account is None and 'account ' in line:
+            github_account = line.split('account ')[1].strip().split(' ')[0].strip()
+    if github_token is None or github_account is None:
+        raise Exception("Failed to parse the output of 'gh auth status'")
     
     print(f'GH: Token successfully loaded for account {github_account} from gh CLI', file=sys.stderr)
-    return github_token, github_account
+    gh_write_cached_token(github_token, github_account)
+    return github_token, github_account, 'gh CLI'
 
 
 # Interesting bug details from Launchpad to feed in GitHub
@@ -115,68 +339,109 @@ def gh_get_user_token_from_cli():
 #   Issue Description = Launchpad bug description
 #   Issue importance = Launchpad bug importance
 
-def gh_create_issue(lp_bug, gh, args):
-    global global_commit_changes
-    global global_github_repo_name
-
+def gh_create_issue(lp_bug_details, gh, cfg):
     gh_issue = None
-    gh_repo = gh.get_repo(global_github_repo_name)
-    
-    print(f'GH: Loaded repo: {gh_repo.full_name}', file=sys.stderr)
-
-
-    gh_issue_title = 'LP:'+str(lp_bug.id) +' '+lp_bug.title
-    if global_commit_changes:
-        gh_issue = gh_repo.create_issue(title=gh_issue_title, body=lp_bug.description)
-        print(f'GH: Created new issue: {gh_issue.html_url}', file=sys.stderr)
+    gh_repo = gh_get_repo(gh, cfg.repo)
+
+
+    gh_issue_title = 'LP:'+str(lp_bug_details['id']) +' '+lp_bug_details['title']
+    gh_issue_labels = [GH_TRIAGE_LABEL, GH_IMPORT_LABEL]
+    gh_issue_assignees = [] if cfg.do_not_assign else [cfg.assignee]
+    if cfg.commit:
+        lp_details = (f'This issue was imported from Launchpad by {cfg.assignee} on {datetime.datetime.now()} \n'
+                      f'Original Launchpad bug: {lp_bug_details["web_link"]}\nOriginal Owner: {lp_bug_details["owner"]}\nOriginal Importance: {lp_bug_details["importance"]}')
+        if cfg.use_import_api:
+            # Imports can carry comments at no extra cost, so the Launchpad details go in their own comment
+            gh_issue = gh_import_issue(gh, gh_repo['full_name'],
+                                       {'title': gh_issue_title, 'body': lp_bug_details['description'], 'labels': gh_issue_labels,
+                                        **({'assignee': gh_issue_assignees[0]} if gh_issue_assignees else {})},
+                                       [{'body': lp_details}])
+        else:
+            # Everything goes in a single POST: the Launchpad details are appended to the body and labels/assignees set inline
+            gh_issue = gh_request(gh, 'POST', f'/repos/{gh_repo["full_name"]}/issues',
+                                  json={'title': gh_issue_title, 'body': f'{lp_bug_details["description"]}\n\n---\n{lp_details}',
+                                        'labels': gh_issue_labels, 'assignees': gh_issue_assignees})
+        print(f'GH: Created new issue: {gh_issue["html_url"]}', file=sys.stderr)
     else:
-        print(f'GH: Dry-run: Would create new issue: {lp_bug.title}', file=sys.stderr)
-    
-    if global_commit_changes:
-        bt = lp_bug.bug_tasks[0]
-        gh_issue.create_comment(f'This issue was imported from Launchpad by {args.github_assignee} on {datetime.datetime.now()} \nOriginal Launchpad bug: {lp_bug.web_link}\nOriginal Owner: {lp_bug.owner.name}\nOriginal Importance: {bt.importance}')
+        print(f'GH: Dry-run: Would create new issue: {lp_bug_details["title"]}', file=sys.stderr)
     print(f'GH: Added Launchpad bug link to issue', file=sys.stderr)
-    
-    if global_commit_changes:
-        gh_issue.add_to_labels(GH_TRIAGE_LABEL)
-        gh_issue.add_to_labels(GH_IMPORT_LABEL)
-    
-    if not args.do_not_assign:
-        if global_commit_changes:
-            gh_issue.edit(assignees=[args.github_assignee])
-        print(f'GH: Assigned issue to {args.github_assignee}', file=sys.stderr)
+
+    if not cfg.do_not_assign:
+        print(f'GH: Assigned issue to {cfg.assignee}', file=sys.stderr)
 
     return gh_issue
 
 
+def gh_import_issue(gh, repo_full_name, issue, comments):
+    # The import endpoint doesn't send notifications, so it is exempt from the secondary rate limit on content creation.
+    # It processes the import asynchronously, poll its status until the issue exists.
+    gh_import = gh_request(gh, 'POST', f'/repos/{repo_full_name}/import/issues',
+                           json={'issue': issue, 'comments': comments}, headers={'Accept': GH_IMPORT_ACCEPT})
+    print(f'GH: Issue import queued: {gh_import["url"]}', file=sys.stderr)
+
+    deadline = time.monotonic() + GH_IMPORT_TIMEOUT
+    while gh_import['status'] != 'imported':
+        if gh_import['status'] == 'failed':
+            raise Exception(f'GitHub issue import failed: {gh_import.get("errors")}')
+        if time.monotonic() > deadline:
+            raise GitHubImportPending(f'GitHub issue import still {gh_import["status"]} after {GH_IMPORT_TIMEOUT}s', gh_import['url'])
+        time.sleep(GH_IMPORT_POLL_INTERVAL)
+        gh_import = gh_request(gh, 'GET', gh_import['url'], headers={'Accept': GH_IMPORT_ACCEPT})
+
+    return gh_request(gh, 'GET', gh_import['issue_url'])
+
+
 # Add a comment in the Launchpad bug with the link to the new GitHub issue, w/ a message for the reporter to go and look at it.
-def lp_update_bug(lp_bug, gh_issue):
-    global global_commit_changes
-    lp_bug.newMessage(content=f'\t---------\nThis issue has been moved to GitHub: {gh_issue.html_url} on {datetime.datetime.now()}\nPlease visit the link on GitHub to continue the discussion, do not comment here.\n\t---------\n')
-    print(f'LP: Added GitHub issue link', file=sys.stderr)
-    lp_bug.tags += [RELOC_TAG]
+def lp_update_bug(lp_bug, gh_issue, cfg):
+    # global_lp_lock is only held around the Launchpad calls, the throttle_post() waits happen outside of it
+    # so they don't hold up the loader thread
+    if cfg.commit:
+        throttle_post()
+    with global_lp_lock:
+        # lp_save() sends the ETag of the representation it modifies, refresh it first so that activity on the bug since it was
+        # loaded (minutes ago with the prefetch queue and the confirmation prompt) doesn't make the save fail
+        lp_bug.lp_refresh()
+        # All attribute changes go out in a single lp_save(), the comment is a separate named operation so it comes last
+        lp_bug.tags = list(lp_bug.tags) + [RELOC_TAG]
+        if cfg.commit:
+            lp_bug.lp_save()
     print(f'LP: Added tag "{RELOC_TAG}"', file=sys.stderr)
     
     # # Only Bug supervisors can change the status to expired
     # bt = lp_bug.bug_tasks[0]
     # bt.status = 'Expired'
     # print('LP: Marked bug as Expired')
-    # if global_commit_changes:
-    #     bt.lp_save()
    
-    if global_commit_changes:
-        lp_bug.lp_save()
+    if cfg.commit:
         print(f'LP: Saved bug', file=sys.stderr)
+        throttle_post()
+        with global_lp_lock:
+            lp_bug.newMessage(content=f'\t---------\nThis issue has been moved to GitHub: {gh_issue["html_url"]} on {datetime.datetime.now()}\nPlease visit the link on GitHub to continue the discussion, do not comment here.\n\t---------\n')
+        print(f'LP: Added GitHub issue link', file=sys.stderr)
     else:
         print(f'LP: Bug was NOT saved', file=sys.stderr)
 
 
-def print_lp_bug_details(lp_bug):
+def lp_get_bug_details(lp_bug):
+    # Read everything needed from the bug once. Following .owner or .bug_tasks costs a Launchpad request on every access.
+    bug_tasks = list(lp_bug.bug_tasks)
+    return {
+        'id': lp_bug.id,
+        'title': lp_bug.title,
+        'description': lp_bug.description,
+        'web_link': lp_bug.web_link,
+        'owner': lp_bug.owner.name,
+        'importance': bug_tasks[0].importance if bug_tasks else None,
+        'tags': list(lp_bug.tags),
+    }
+
+
+def print_lp_bug_details(lp_bug_details):
     # Print bug details
-    print(f'\tBug ID: {lp_bug.id}')
-    print(f'\tTitle: {lp_bug.title}')
-    print(f'\tWeb Link: {lp_bug.web_link}')
-    print(f'\tOwner: {lp_bug.owner.name}')
+    print(f'\tBug ID: {lp_bug_details["id"]}')
+    print(f'\tTitle: {lp_bug_details["title"]}')
+    print(f'\tWeb Link: {lp_bug_details["web_link"]}')
+    print(f'\tOwner: {lp_bug_details["owner"]}')
     
     # bt = lp_bug.bug_tasks[0]
     # print(f'\tTask: \n\t\ttarget_name {bt.bug_target_name}\n\t\tstatus {bt.status}\n\t\timportance {bt.importance}\n\t\tassignee {bt.assignee.name}\n\t\tmilestone {bt.milestone}')
@@ -187,100 +452,193 @@ def print_lp_bug_details(lp_bug):
     #         print(f'\t  {tag}')
 
 
-def main():
-    global global_commit_changes  # Declare that we are using the global variable
-    global global_github_repo_name  # Declare that we are using the global variable
+def lp_load_bugs(lp, lp_bug_ids, lp_bugs_queue):
+    # Runs in its own thread, so the next bugs are fetched from Launchpad while the current one is moved to GitHub
+    for lp_bug_id in lp_bug_ids:
+        try:
+            with global_lp_lock:
+                lp_bug = lp.bugs[lp_bug_id]
+                lp_bug_details = lp_get_bug_details(lp_bug)
+            lp_bugs_queue.put((lp_bug_id, lp_bug, lp_bug_details, None))
+        except KeyError:
+            lp_bugs_queue.put((lp_bug_id, None, None, Exception('bug not found on Launchpad')))
+        except Exception as e:
+            lp_bugs_queue.put((lp_bug_id, None, None, e))
+    lp_bugs_queue.put(None)
 
-    
+
+def lp_bug_relocated(lp_bug_id, lp_bug_tags):
+    if RELOC_TAG in lp_bug_tags:
+        print(f'Bug {lp_bug_id} was already relocated to GitHub! (it has the {RELOC_TAG} tag)', file=sys.stderr)
+        return True
+    return False
+
+
+def move_bug(lp_bug, lp_bug_details, gh, cfg):
+    # Returns True if the bug was moved to GitHub
+    print("LP: Bug to be relocated:")
+    print_lp_bug_details(lp_bug_details)
+
+    # Check if bug was already relocated to GitHub, if so, skip it
+    if lp_bug_relocated(lp_bug_details['id'], lp_bug_details['tags']):
+        return False
+
+    # Ask user to confirm before proceedin by typing 'y', otherwise default is 'N'
+    if not cfg.i_am_sure:
+        proceed = input('Proceed with moving the bug to GitHub? [y/N]:')
+        if proceed.lower() != 'y':
+            print('User opted out.')
+            return False
+        else:
+            print('\nProceeding...')
+
+    # The tags above were read when the bug was prefetched, it may have been relocated since (e.g. by another run).
+    # Check again on a fresh copy before writing anything to GitHub.
+    with global_lp_lock:
+        lp_bug.lp_refresh()
+        lp_bug_tags = list(lp_bug.tags)
+    if lp_bug_relocated(lp_bug_details['id'], lp_bug_tags):
+        return False
+
+    # Create a new issue in the GitHub repository with the same title, description, and comments.
+    gh_issue = gh_create_issue(lp_bug_details, gh, cfg)
+    if gh_issue is None:
+        print("GH: Issue was NOT created.")
+        return False
+
+    # Add a comment in the Launchpad bug with the link to the new GitHub issue, w/ a message for the reporter to go and look at it.
+    # From here on the GitHub issue exists, a failure must not lead to the bug being retried
+    try:
+        lp_update_bug(lp_bug, gh_issue, cfg)
+    except Exception as e:
+        raise LaunchpadNotUpdated(f'GitHub issue {gh_issue["html_url"]} created, Launchpad bug {lp_bug_details["id"]} not updated: {e!r}') from e
+    return True
+
+
+def main():
     parser = argparse.ArgumentParser(usage=__doc__)
-    parser.add_argument('lp_bug_id', help='Launchpad issue id #',type=int)
+    parser.add_argument('lp_bug_id', help='Launchpad issue id #', type=int, nargs='+')
     parser.add_argument('--github_token', help='GitHub personal access token', type=str, default="None")
     parser.add_argument('--github_assignee', help='GitHub user to assign the issue to', type=str, default="None")
     parser.add_argument('--github_repo', help='GitHub repository to move the bug to', type=str, default=GH_DEFAULT_REPO)
     parser.add_argument('--do_not_assign', help='Automatically assign the issue to the assignee provided or taken from "gh" CLI', action='store_true')
+    parser.add_argument('--use_import_api', help='Create the issue through the GitHub issue import API', action='store_true')
     parser.add_argument('--commit_changes', help='Commit changes to GitHub and Launchpad or just do a dry-run', action='store_true')
     parser.add_argument('--i_am_sure', help='Confirm that you want to proceed with moving the bug to GitHub', action='store_true')
 
     args = parser.parse_args()
-    global_commit_changes = args.commit_changes
+    # The same bug given twice would be moved twice
+    args.lp_bug_id = list(dict.fromkeys(args.lp_bug_id))
 
     print("Bootstrapping...")
+    github_token_source = 'command-line'
     if args.github_token == "None":
         try:
-            print("GH: No token provided via command-line, attempting fetch from 'gh' CLI")
+            print("GH: No token provided via command-line, attempting fetch from 'gh' config, environment or CLI")
             gh_user_details = gh_get_user_token_from_cli()
-            args.github_token = gh_user_details[0]
+            args.github_token, _, github_token_source = gh_user_details
             if args.github_assignee == "None":
-                args.github_assignee = gh_user_details[1]
+                if gh_user_details[1] is not None:
+                    args.github_assignee = gh_user_details[1]
             else:
                 print(f'GH: Assignee provided via command-line: {args.github_assignee}', file=sys.stderr)
-                gh_user_details = (args.github_token, args.github_assignee)
         except Exception as e:
-            print(f"Failed to get GitHub token from gh CLI: {e}", file=sys.stderr)
+            print(f"Failed to get GitHub token: {e}", file=sys.stderr)
             sys.exit()
 
     print("\nTool Configuration:")
 
     if args.github_repo:
-        global global_github_repo_name
         print(f'\t> The new GitHub issue will be created in {args.github_repo}')
-        global_github_repo_name = args.github_repo
 
-    if args.github_assignee:
+    if args.github_assignee != "None":
         print(f'\t> GitHub assignee is {args.github_assignee}')
     else:
-        print("\t> No assignee provided for the GitHub issue.")
-
-    if not args.do_not_assign and args.github_assignee=="None":
-        print("Error: GitHub assignee is required when --do_not_assign is not provided.")
-        sys.exit()
+        print("\t> No assignee provided, the account the GitHub token belongs to will be used.")
 
     if args.do_not_assign:
         print("\t> GitHub issue will NOT be automatically assigned.")
-    else:
+    elif args.github_assignee != "None":
         print(f'\t> GitHub issue will be automatically assigned to {args.github_assignee}')
 
+    if len(args.lp_bug_id) > 1:
+        args.use_import_api = True
+    if args.use_import_api:
+        print("\t> GitHub issues will be created through the issue import API")
+
 
 
     # Launchpad and GitHub login
     print("\nLogging in. Please follow instructions if prompted.")
     lp = lp_login()
-    gh = gh_login(gh_user_details)
+    try:
+        gh, gh_login_name = gh_login(args.github_token)
+    except GitHubError as e:
+        # The cached token isn't checked when it is read, if it has been revoked since drop it and fetch a fresh one
+        if github_token_source != 'cache' or e.status_code != 401:
+            raise
+        gh_forget_cached_token()
+        print(f'GH: Login failed with the cached token, refreshing it: {e}', file=sys.stderr)
+        args.github_token = gh_get_user_token_from_cli()[0]
+        gh, gh_login_name = gh_login(args.github_token)
+    gh_repo = gh_get_repo(gh, args.github_repo)
+    print(f'GH: Loaded repo: {gh_repo["full_name"]}', file=sys.stderr)
+    if args.github_assignee == "None":
+        args.github_assignee = gh_login_name
+        if not args.do_not_assign:
+            print(f'GH: GitHub issue will be automatically assigned to {args.github_assignee}', file=sys.stderr)
+    if not args.do_not_assign:
+        args.github_assignee = gh_get_user(gh, args.github_assignee)['login']
     print()
 
-    # Load Launchpad bug
-    lp_bug = lp.bugs[args.lp_bug_id]
-    print("LP: Bug to be relocated:")
-    print_lp_bug_details(lp_bug)
-
-    # Check if bug was already relocated to GitHub, if so, exit
-    if RELOC_TAG in lp_bug.tags:
-        print(f'Bug {lp_bug.id} was already relocated to GitHub! (it has the {RELOC_TAG} tag)', file=sys.stderr)
-        sys.exit()
+    cfg = RunConfig(commit=args.commit_changes, repo=args.github_repo, assignee=args.github_assignee,
+                    do_not_assign=args.do_not_assign, use_import_api=args.use_import_api, i_am_sure=args.i_am_sure)
 
-    if global_commit_changes:
+    if cfg.commit:
         print("!! ATTENTION: Changes will be committed to GitHub and Launchpad. !!\n")
     else:
         print("Changes will NOT be committed, neither to GitHub nor to Launchpad.\n")
 
-    # Ask user to confirm before proceedin by typing 'y', otherwise default is 'N'
-    if not args.i_am_sure:
-        proceed = input('Proceed with moving the bug to GitHub? [y/N]:')
-        if proceed.lower() != 'y':
-            print('User opted out.')
-            sys.exit()
-        else:
-            print('\nProceeding...')
-
-    # Create a new issue in the GitHub repository with the same title, description, and comments.
-    gh_issue = gh_create_issue(lp_bug, gh, args)
-    if gh_issue is None:
-        print("GH: Issue was NOT created. Exiting.")
-        sys.exit()
-
-    # Add a comment in the Launchpad bug with the link to the new GitHub issue, w/ a message for the reporter to go and look at it.
-    lp_update_bug(lp_bug, gh_issue)
-    print('Done!', file=sys.stderr)
+    # Load Launchpad bugs in the background and move them one at a time, as they come in.
+    # GitHub writes are spaced by throttle_post() anyway, so a single mover keeps the output readable without losing throughput.
+    lp_bugs_queue = queue.Queue(maxsize=LP_PREFETCH_DEPTH)
+    threading.Thread(target=lp_load_bugs, args=(lp, args.lp_bug_id, lp_bugs_queue), daemon=True).start()
+
+    moved_bug_ids = []
+    failed_bug_ids = []
+    followup_bugs = []  # Not safe to retry, their GitHub issue exists or may still appear
+    while True:
+        item = lp_bugs_queue.get()
+        if item is None:
+            break
+        lp_bug_id, lp_bug, lp_bug_details, error = item
+        if error is None:
+            try:
+                if move_bug(lp_bug, lp_bug_details, gh, cfg):
+                    moved_bug_ids.append(lp_bug_id)
+            except GitHubImportPending as e:
+                print(f'GH: {e}, Launchpad bug {lp_bug_id} NOT updated: {e.import_url}', file=sys.stderr)
+                followup_bugs.append(f'{lp_bug_id}: import pending, check {e.import_url}')
+            except LaunchpadNotUpdated as e:
+                print(f'LP: {e}', file=sys.stderr)
+                followup_bugs.append(f'{lp_bug_id}: {e}')
+            except Exception as e:
+                error = e
+        if error is not None:
+            print(f'Failed to move bug {lp_bug_id}: {error}', file=sys.stderr)
+            failed_bug_ids.append(lp_bug_id)
+        print()
+
+    print(f'Done! {len(moved_bug_ids)} of {len(args.lp_bug_id)} bug(s) moved to GitHub.', file=sys.stderr)
+    if failed_bug_ids:
+        print(f'Failed bugs: {" ".join(str(i) for i in failed_bug_ids)}', file=sys.stderr)
+    if followup_bugs:
+        print('Bugs needing a manual follow-up, do NOT retry them:', file=sys.stderr)
+        for followup_bug in followup_bugs:
+            print(f'\t{followup_bug}', file=sys.stderr)
+        sys.exit(2)
+    if failed_bug_ids:
+        sys.exit(1)
 
 
 def no_credential():